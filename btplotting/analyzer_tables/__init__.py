@@ -13,10 +13,15 @@ from .sqn import datatable as sqn
 
 _logger = logging.getLogger(__name__)
 _DATATABLE_FNC_NAME = 'get_analysis_table'
+_injected = False
 
 
 def inject_datatables():
     '''Injects function 'get_analysis_table' to some well-known Analyzer classes.'''
+    global _injected
+    if _injected:
+        return
+    _injected = True
     _atables = {
         backtrader.analyzers.sharpe.SharpeRatio: sharperatio,
         backtrader.analyzers.DrawDown: drawdown,
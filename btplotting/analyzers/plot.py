@@ -1,18 +1,46 @@
 import asyncio
 import logging
-from threading import Thread, Lock
+from threading import Thread, Lock, Event
 
 import backtrader as bt
 
 import tornado.ioloop
 
 from ..app import BacktraderPlotting
-from ..webapp import Webapp
 from ..schemes import Blackly
 from ..live.client import LiveClient
 
 _logger = logging.getLogger(__name__)
 
+# IOLoop shared by all live plot servers, running in a background thread
+_ioloop = None
+_ioloop_lock = Lock()
+
+
+def _get_ioloop():
+    '''
+    Returns the shared IOLoop, the IOLoop and its thread will be
+    started on first use
+    '''
+    global _ioloop
+    with _ioloop_lock:
+        if _ioloop is None:
+            started = Event()
+            loops = []
+
+            def t_ioloop():
+                asyncio.set_event_loop(asyncio.new_event_loop())
+                loops.append(tornado.ioloop.IOLoop.current())
+                started.set()
+                loops[0].start()
+
+            t = Thread(target=t_ioloop)
+            t.daemon = True
+            t.start()
+            started.wait()
+            _ioloop = loops[0]
+    return _ioloop
+
 
 class LivePlotAnalyzer(bt.Analyzer):
 
@@ -32,6 +60,8 @@ class LivePlotAnalyzer(bt.Analyzer):
         if title is None:
             title = 'Live %s' % type(self.strategy).__name__
         self._title = title
+        # bokeh server is only imported when a live plot is created
+        from ..webapp import Webapp
         self._webapp = Webapp(
             self._title,
             'basic.html.j2',
@@ -44,23 +74,29 @@ class LivePlotAnalyzer(bt.Analyzer):
             iplot=iplot)
         self._lock = Lock()
         self._clients = {}
-        self._app_kwargs = kwargs
-
-    def _create_app(self):
-        return BacktraderPlotting(
+        self._app_kwargs = dict(
             style=self.p.style,
             scheme=self.p.scheme,
-            **self._app_kwargs)
+            **kwargs)
+
+    def _create_app(self):
+        return BacktraderPlotting(**self._app_kwargs)
 
     def _on_session_destroyed(self, session_context):
         with self._lock:
-            self._clients[session_context.id].stop()
-            del self._clients[session_context.id]
+            client = self._clients.pop(session_context.id, None)
+        # stop the client without holding the lock, stopping will wait
+        # for the client thread to finish
+        if client is not None:
+            client.stop()
 
-    def _t_server(self):
-        asyncio.set_event_loop(asyncio.new_event_loop())
-        loop = tornado.ioloop.IOLoop.current()
-        self._webapp.start(loop)
+    def _get_clients(self):
+        '''
+        Returns a snapshot of all connected clients as
+        (session_id, client) tuples
+        '''
+        with self._lock:
+            return list(self._clients.items())
 
     def _app_cb_build_root_model(self, doc):
         client = LiveClient(doc,
@@ -78,21 +114,44 @@ class LivePlotAnalyzer(bt.Analyzer):
         Start from backtrader
         '''
         _logger.debug('Starting PlotListener...')
-        t = Thread(target=self._t_server)
-        t.daemon = True
-        t.start()
+        loop = _get_ioloop()
+        loop.add_callback(self._webapp.start, loop)
 
     def stop(self):
         '''
         Stop from backtrader
         '''
         _logger.debug('Stopping PlotListener...')
-        for c in list(self._clients.values()):
+        for _, c in self._get_clients():
             c.stop()
 
     def next(self):
         '''
         Next from backtrader, new data arrives
         '''
-        for c in list(self._clients.values()):
-            c.next()
+        # the length of the strategy is resolved once per tick and
+        # shared by all clients
+        strategylen = len(self.strategy)
+        # clients are updated without holding the lock, a slow client
+        # should not block sessions being created or destroyed
+        failed = []
+        for session_id, c in self._get_clients():
+            try:
+                c.next(strategylen)
+            except Exception:
+                _logger.exception(f'Error while updating client {session_id}')
+                failed.append((session_id, c))
+        if not failed:
+            return
+        # remove failed clients, clients already removed by a destroyed
+        # session were stopped there
+        stopped = []
+        with self._lock:
+            for session_id, c in failed:
+                if self._clients.get(session_id) is c:
+                    del self._clients[session_id]
+                    stopped.append(c)
+        # stop the clients without holding the lock, stopping will wait
+        # for the client thread to finish
+        for c in stopped:
+            c.stop()
@@ -9,10 +9,11 @@ import tempfile
 
 import backtrader as bt
 
+import numpy as np
 import pandas as pd
 
 from bokeh.models import TabPanel, Tabs, InlineStyleSheet
-from bokeh.layouts import gridplot, column
+from bokeh.layouts import column
 
 from bokeh.embed import file_html
 from bokeh.resources import CDN, Resources
@@ -21,18 +22,16 @@ from bokeh.util.browser import view
 from bokeh.io import show
 from bokeh.io.export import get_screenshot_as_png
 
-from jinja2 import Environment, PackageLoader
-
 from .schemes import Scheme, Blackly
 
-from .utils import get_dataname, get_datanames, \
-    get_plotobjs, filter_obj
+from .utils import get_plotobjs, filter_obj
 from .figure import FigurePage, FigureType, Figure
 from .clock import DataClockHandler
 from .helper.label import obj2label
-from .helper.bokeh import generate_stylesheet
+from .helper.bokeh import generate_stylesheet, get_template
 from .tab import BacktraderPlottingTab
 from .tabs import AnalyzerTab, MetadataTab, LogTab, SourceTab
+from .analyzer_tables import inject_datatables
 
 if 'ipykernel' in sys.modules:
     from IPython.core.display import display, HTML
@@ -77,18 +76,26 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
         if not isinstance(self.p.scheme, Scheme):
             raise Exception('Provided scheme has to be a subclass'
                             ' of btplotting.schemes.scheme.Scheme')
+        # initialize analyzer tables on first use
+        inject_datatables()
         # set new scheme instance for app, so source scheme
         # remains untouched
         self.scheme = copy(self.p.scheme)
-        # store css stylesheet for bokeh styling
-        self.stylesheet = InlineStyleSheet(
-            css=generate_stylesheet(self.scheme, 'bokeh.css.j2'))
         # apply additional parameters to override / set scheme settings
         for pname, pvalue in kwargs.items():
             setattr(self.scheme, pname, pvalue)
+        # rendered stylesheets, the styling of the scheme does not change
+        self._stylesheets = {}
+        # store css stylesheet for bokeh styling
+        self.stylesheet = InlineStyleSheet(
+            css=self._output_stylesheet('bokeh.css.j2'))
 
         self._iplot = None
         self._figurepages = {}
+        # plot objects of figurepages, kept for updates of figurepages
+        self._plotobjs = {}
+        # parse plotconfig once, it will be applied to every object
+        self._plotconfig = self._parse_plotconfig(self.p.plotconfig)
         # set tabs
         self.tabs = copy(self.p.tabs)
         if self.p.use_default_tabs:
@@ -108,6 +115,29 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
         Resets the app
         '''
         self._figurepages = {}
+        self._plotobjs = {}
+
+    def _parse_plotconfig(self, plotconfig):
+        '''
+        Parses the given plotconfig into a list of tuples
+        (ctype, target, config) with prepared targets
+        '''
+        res = []
+        if plotconfig is None:
+            return res
+        for k, config in plotconfig.items():
+            ctype, target = k.split(':')
+            if ctype == 'r':  # regex
+                target = re.compile(target)
+            elif ctype[0] == '#':  # index
+                ctype = '#'
+                target_type, target_idx = target.split('-')
+                target = (FigureType.get_obj(target_type), int(target_idx))
+            elif ctype not in ('id', 'name'):
+                raise RuntimeError(
+                    f'Unknown config type in plotting config: {k}')
+            res.append((ctype, target, config))
+        return res
 
     def _configure_plotting(self, figid=0):
         '''
@@ -136,48 +166,63 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
         if not hasattr(obj.plotinfo, 'plotorder'):
             obj.plotinfo.plotorder = 0
 
-        if self.p.plotconfig is None:
+        if not self._plotconfig:
             return
 
         def apply_config(obj, config):
             for k, v in config.items():
                 setattr(obj.plotinfo, k, v)
 
-        for k, config in self.p.plotconfig.items():
-            ctype, target = k.split(':')
-            if ctype == 'r':  # regex
+        # label of object is only created when needed, it is created
+        # again if a config was applied, since the config may change it
+        label = None
+        for ctype, target, config in self._plotconfig:
+            if ctype in ('r', 'name') and label is None:
                 label = obj2label(obj)
-                m = re.match(target, label)
+            if ctype == 'r':  # regex
+                m = target.match(label)
                 if m:
                     apply_config(obj, config)
-            elif ctype[0] == '#':  # index
-                target_type, target_idx = target.split('-')
+                    label = None
+            elif ctype == '#':  # index
+                target_cls, target_idx = target
                 # check if instance type matches
-                if not isinstance(obj, FigureType.get_obj[target_type]):
+                if not isinstance(obj, target_cls):
                     continue
-                if int(target_idx) != idx:
+                if target_idx != idx:
                     continue
                 apply_config(obj, config)
+                label = None
             elif ctype == 'id':  # plotid
                 plotid = obj.plotinfo.plotid
                 if plotid is None or plotid != target:
                     continue
                 apply_config(obj, config)
+                label = None
             elif ctype == 'name':  # name
-                label = obj2label(obj)
-                if not label.contains(target):
+                if target not in label:
                     continue
                 apply_config(obj, config)
-            else:
-                raise RuntimeError(
-                    f'Unknown config type in plotting config: {k}')
+                label = None
 
     def _get_plotobjs(self, figid=0, filterdata=None):
         '''
         Returns a filtered dict of objects to be plotted
         '''
         fp = self.get_figurepage(figid)
-        objs = get_plotobjs(fp.strategy, order_by_plotmaster=True)
+        strategy = fp.strategy
+        # the plot objects are only collected again if the figurepage
+        # or the objects of the strategy changed
+        key = (id(fp),
+               len(strategy.datas),
+               len(strategy.getindicators()),
+               len(strategy.getobservers()))
+        cached = self._plotobjs.get(figid)
+        if cached is not None and cached[0] == key:
+            objs = cached[1]
+        else:
+            objs = get_plotobjs(strategy, order_by_plotmaster=True)
+            self._plotobjs[figid] = (key, objs)
         filtered = {}
         for o in objs:
             if filter_obj(o, filterdata):
@@ -201,7 +246,7 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
 
         # store data clock in figurepage
         dataname = False
-        for i in get_datanames(strategy, True):
+        for i in fp.get_datanames(True):
             dataname = i
             if not filter_obj(strategy.getdatabyname(i), filterdata):
                 break
@@ -212,6 +257,9 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
 
         # create figures
         figures = []
+        # data figures get a separate volume figure if volume
+        # is not overlayed
+        plot_volume = scheme.volume and scheme.voloverlay is False
         for parent, childs in objs.items():
             figure = Figure(
                 fp=fp,
@@ -223,28 +271,31 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
                 figure.plot(c)
             figure.apply()
             figures.append(figure)
-
-        # link axis
-        for i in range(1, len(figures)):
-            figures[i].figure.x_range = figures[0].figure.x_range
-
-        # add figures to figurepage
-        fp.figures += figures
-
-        # volume figures
-        if self.scheme.volume and self.scheme.voloverlay is False:
-            for f in figures:
-                if not f.get_type() == FigureType.DATA:
-                    continue
+            # volume figure
+            if plot_volume and figure.get_type() == FigureType.DATA:
                 figure = Figure(
                     fp=fp,
                     scheme=scheme,
-                    master=f.master,
+                    master=parent,
                     childs=[],
                     type=FigureType.VOL)
-                figure.plot_volume(f.master)
+                figure.plot_volume(parent)
                 figure.apply()
-                fp.figures.append(figure)
+                figures.append(figure)
+
+        # add figures to figurepage
+        fp.figures += figures
+
+        # sort figures once, the sorted figures are used when
+        # generating models
+        # figures without data (strategy) and unknown datas are first
+        data_sort = {
+            d: i for i, d in enumerate(
+                fp.get_datanames(onlyplotable=False), start=1)}
+        fp.sorted_figures = sorted(fp.figures, key=lambda x: (
+            x.get_plotorder(),
+            data_sort.get(x.get_dataname(), 0),
+            x.get_type().value))
 
         # apply all figurepage related functionality after all figures
         # are set
@@ -262,9 +313,13 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
 
     def _output_stylesheet(self, template='basic.css.j2'):
         '''
-        Renders and returns the stylesheet
+        Renders and returns the stylesheet, every stylesheet
+        is only rendered once
         '''
-        return generate_stylesheet(self.scheme, template)
+        if template not in self._stylesheets:
+            self._stylesheets[template] = generate_stylesheet(
+                self.scheme, template)
+        return self._stylesheets[template]
 
     def _output_plotfile(self, model, figid=0, filename=None,
                          template='basic.html.j2'):
@@ -275,22 +330,27 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
             tmpdir = tempfile.gettempdir()
             filename = os.path.join(tmpdir, f'bt_bokeh_plot_{figid}.html')
 
+        # templates are shared, so the time is passed as a variable
+        # instead of setting it in the globals of the template
         now = datetime.now()
-        env = Environment(loader=PackageLoader('btplotting', 'templates'))
-        templ = env.get_template(template)
-        templ.globals['now'] = now.strftime('%Y-%m-%d %H:%M:%S')
+        templ = get_template(template)
 
         html = file_html(model,
                          template=templ,
                          resources=CDN,
                          template_variables=dict(
+                             now=now.strftime('%Y-%m-%d %H:%M:%S'),
                              stylesheet=self._output_stylesheet(),
                              show_headline=self.scheme.show_headline,
                              headline=self.scheme.headline),
                          _always_new=True)
 
-        with open(filename, 'w') as f:
+        # write to a temporary file first and replace the plot file
+        # with it, so the plot file is never read partially written
+        tmp_filename = f'{filename}.tmp'
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
             f.write(html)
+        os.replace(tmp_filename, filename)
 
         return filename
 
@@ -340,7 +400,7 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
         fp = self.get_figurepage(figid)
         if use_tabs:
             if fp.strategy is not None:
-                tab_panels = self.generate_bokeh_model_tab_panels()
+                tab_panels = self.generate_bokeh_model_tab_panels(figid)
             else:
                 tab_panels = []
 
@@ -349,10 +409,10 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
                 if tab.is_useable():
                     tab_panels.append(tab.get_tab_panel())
             # set all tabs (filter out None)
-            all_tabs = list(filter(None.__ne__, tab_panels))
+            all_tabs = [t for t in tab_panels if t is not None]
             model = Tabs(tabs=all_tabs, sizing_mode='stretch_width')
         else:
-            model = self.generate_bokeh_model_plots()
+            model = self.generate_bokeh_model_plots(figid)
         # attach the model to the underlying figure for
         # later reference (e.g. unit test)
         fp.model = model
@@ -365,22 +425,15 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
         '''
         fp = self.get_figurepage(figid)
 
-        # sort figures
-        data_sort = {False: 0}
-        for i, d in enumerate(
-                get_datanames(fp.strategy, onlyplotable=False),
-                start=1):
-            data_sort[d] = i
-        sorted_figs = list(fp.figures)
-        sorted_figs.sort(key=lambda x: (
-            x.get_plotorder(),
-            data_sort[get_dataname(x.master)],
-            x.get_type().value))
-
         # fill tabs
         multiple_tabs = self.scheme.multiple_tabs
+        figtype_tabs = {
+            FigureType.DATA: 'Datas',
+            FigureType.VOL: 'Datas',
+            FigureType.OBS: 'Observers',
+            FigureType.IND: 'Indicators'}
         tabs = defaultdict(list)
-        for f in sorted_figs:
+        for f in fp.sorted_figures:
             tab = f.get_plottab()
             if tab:
                 tabs[tab].append(f)
@@ -388,33 +441,29 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
                 tabs['Plots'].append(f)
             else:
                 figtype = f.get_type()
-                if figtype == FigureType.DATA:
-                    tabs['Datas'].append(f)
-                elif figtype == FigureType.OBS:
-                    tabs['Observers'].append(f)
-                elif figtype == FigureType.IND:
-                    tabs['Indicators'].append(f)
-                else:
+                if figtype not in figtype_tabs:
                     raise Exception(f'Unknown FigureType "{figtype}"')
+                tabs[figtype_tabs[figtype]].append(f)
 
         # create tab panels for tabs
+        xaxis_bottom = self.scheme.xaxis_pos == 'bottom'
+        toolbar_location = self.scheme.toolbar_location
         tab_panels = []
-        for tab in tabs:
-            if len(tabs[tab]) == 0:
+        for tab, tab_figs in tabs.items():
+            if len(tab_figs) == 0:
                 continue
             # configure xaxis visibility
-            if self.scheme.xaxis_pos == 'bottom':
-                for i, x in enumerate(tabs[tab]):
-                    x.figure.xaxis.visible = (
-                        False if i < len(tabs[tab]) - 1
-                        else True)
-            # create gridplot for tab panel
-            plot_figures = [[x.figure] for x in tabs[tab]]
-            g = gridplot(plot_figures,
-                         sizing_mode='stretch_width',
-                         merge_tools=False,
-                         toolbar_options={'logo': None, 'autohide': True},
-                         toolbar_location=self.scheme.toolbar_location,)
+            if xaxis_bottom:
+                last = len(tab_figs) - 1
+                for i, x in enumerate(tab_figs):
+                    x.figure.xaxis.visible = i == last
+            # figures are displayed in a single column, every figure
+            # keeps its own toolbar, so no grid layout is needed
+            plot_figures = []
+            for x in tab_figs:
+                x.figure.toolbar_location = toolbar_location
+                plot_figures.append(x.figure)
+            g = column(plot_figures, sizing_mode='stretch_width')
             # append created tab panel
             tab_panels.append(TabPanel(title=tab, child=g))
 
@@ -426,26 +475,19 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
         '''
         fp = self.get_figurepage(figid)
 
-        # sort figures
-        data_sort = {False: 0}
-        for i, d in enumerate(
-                get_datanames(fp.strategy, onlyplotable=False),
-                start=1):
-            data_sort[d] = i
-        sorted_figs = list(fp.figures)
-        for f in sorted_figs:
+        all_figures = []
+        for f in fp.sorted_figures:
             f.figure.toolbar.logo = None
             f.figure.toolbar_location = None
-        sorted_figs.sort(key=lambda x: (
-            x.get_plotorder(),
-            data_sort[get_dataname(x.master)],
-            x.get_type().value))
-        all_figures = [x.figure for x in sorted_figs]
+            all_figures.append(f.figure)
         return column(all_figures)
 
-    def get_data(self, figid=0, startidx=None, start=None, end=None, back=None) -> pd.DataFrame:
+    def get_data(self, figid=0, startidx=None, start=None, end=None, back=None,
+                 fillcds=True) -> pd.DataFrame:
         '''
         Returns data for given figurepage
+        If fillcds is True, the ColumnDataSource of all figures will be
+        set to the returned data
         '''
         fp = self.get_figurepage(figid)
         data_clock: DataClockHandler = fp.data_clock
@@ -462,23 +504,32 @@ class BacktraderPlotting(metaclass=bt.MetaParams):
         # create datetime column
         dt_idx = data_clock.get_dt_list(startidx, endidx)
         # create index column
-        int_idx = data_clock.get_idx_list(startidx, endidx)
-        assert startidx == int_idx[0] and endidx == int_idx[-1], "wrong"
-
-        df = pd.DataFrame(
-            data={
-                'index': pd.Series(int_idx, dtype='int64'),
-                'datetime': pd.Series(dt_idx, dtype='datetime64[ns]')})
-
-        # generate data for all figurepage objects
-        df_objs = []
-
-        for f in fp.figures:
-            f_df_objs = f.set_cds(data_clock, startidx, endidx, dt_idx, int_idx)
-            if f_df_objs:
-                df_objs.extend(f_df_objs)
-
-        df = df.join(df_objs)
+        int_idx = np.arange(startidx, endidx + 1, dtype=np.int64)
+        assert len(int_idx) == len(dt_idx), "wrong"
+        # convert datetime only once, all figures will use the
+        # converted columns. plain arrays are used, so no index
+        # needs to be created and aligned for the columns
+        dt_idx = np.asarray(dt_idx, dtype='datetime64[ns]')
+
+        data = {
+            'index': int_idx,
+            'datetime': dt_idx}
+
+        # generate data for all figurepage objects, objects used in
+        # multiple figures with the same settings will only be generated
+        # once. volume figures are generated first, so the columns of a
+        # data are taken from the figure the data is plotted in, since
+        # the volume figure may use different settings for the data
+        objs_data = {}
+        figures = sorted(
+            fp.figures, key=lambda x: x.get_type() != FigureType.VOL)
+        for f in figures:
+            data.update(f.set_cds(
+                data_clock, startidx, endidx, dt_idx, int_idx,
+                fillcds=fillcds, objs_data=objs_data))
+
+        # create dataframe with all data at once
+        df = pd.DataFrame(data)
 
         data_clock.uinit_clk(endidx)
 
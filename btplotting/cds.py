@@ -28,8 +28,16 @@ class CDSObject:
 
     def __init__(self, cols=[]):
         self._cds_cols = []
+        # string columns and additional columns are also kept
+        # separately, so they don't need to be split on every use
+        self._cds_cols_str = []
+        self._cds_cols_additional = []
+        # set of string columns for fast lookup
+        self._cds_cols_set = set()
         self._cds_cols_default = cols
         self._cds = ColumnDataSource()
+        # map of index values to rows in ColumnDataSource
+        self._idx_map = None
         self.set_cds_col(cols)
 
     @property
@@ -53,15 +61,9 @@ class CDSObject:
         - columns: columns from data source
         - additional: additional data sources which should be
           created from data source
+        The returned lists should not be modified.
         '''
-        columns = []
-        additional = []
-        for c in self._cds_cols:
-            if isinstance(c, str):
-                columns.append(c)
-            else:
-                additional.append(c)
-        return columns, additional
+        return self._cds_cols_str, self._cds_cols_additional
 
     def _create_cds_col_from_df(self, op, df):
         '''
@@ -71,12 +73,19 @@ class CDSObject:
                     [2] - other column or value
                     [3] - op method (callable with 2 params: a, b)
         '''
-        a = np.array(df[op[1]])
+        # columns are used without copying them, the op method
+        # creates a new array for the result
+        a = df[op[1]].to_numpy()
         if isinstance(op[2], str):
-            b = np.array(df[op[2]])
+            b = df[op[2]].to_numpy()
         else:
-            b = np.full(df.shape[0], op[2])
+            # a value is broadcasted without allocating a column for it
+            b = np.broadcast_to(op[2], a.shape)
         arr = op[3](a, b)
+        if arr is a or arr is b:
+            # op method returned one of the operands, create a new
+            # column from it, so it is neither read only nor shared
+            arr = np.array(arr)
         return arr
 
     def _create_cds_col_from_series(self, op, series):
@@ -98,10 +107,13 @@ class CDSObject:
             col = [col]
         for c in col:
             if isinstance(c, str):
-                if c not in self._cds_cols:
+                if c not in self._cds_cols_set:
                     self._cds_cols.append(c)
+                    self._cds_cols_str.append(c)
+                    self._cds_cols_set.add(c)
             elif isinstance(c, tuple) and len(c) == 4:
                 self._cds_cols.append(c)
+                self._cds_cols_additional.append(c)
             else:
                 raise Exception("Unsupported col provided")
 
@@ -116,21 +128,23 @@ class CDSObject:
             columns = list(df.columns)
         columns = ['index', 'datetime'] + [
             x for x in columns if x not in ['index', 'datetime']]
-        try:
-            c_df = df.loc[:, columns]
-        except Exception:
+        # resolve the positions of all columns at once, so the columns
+        # can be taken from the DataFrame without creating a copy of it
+        positions = df.columns.get_indexer(columns)
+        if (positions < 0).any():
             return None
 
+        # set cds, all columns are replaced at once so only a single
+        # change event is triggered on the ColumnDataSource. the arrays
+        # are copied, since ColumnDataSource modifies them in place when
+        # patching and they should not share memory with the DataFrame
+        data = dict(self._cds.data)
+        for c, pos in zip(columns, positions):
+            data[c] = df.iloc[:, pos].to_numpy(copy=True)
         # add additional columns
         for a in additional:
-            col = self._create_cds_col_from_df(a, c_df)
-            c_df[a[0]] = col
-
-        # set cds
-        for c in c_df.columns:
-            if c in self._cds.column_names:
-                self._cds.remove(c)
-            self._cds.add(np.array(c_df[c]), c)
+            data[a[0]] = self._create_cds_col_from_df(a, df)
+        self._cds.data = data
 
     def get_cds_streamdata_from_df(self, df):
         '''
@@ -141,21 +155,36 @@ class CDSObject:
             columns = list(df.columns)
         columns = ['index', 'datetime'] + [
             x for x in columns if x not in ['index', 'datetime']]
-        try:
-            c_df = df.loc[:, columns]
-            c_df.fillna('NaN')
-        except Exception:
+        positions = df.columns.get_indexer(columns)
+        if (positions < 0).any():
             return {}
 
+        # stream data is created from the columns directly, the arrays
+        # are copied, since ColumnDataSource may modify them in place
+        res = {}
+        for c, pos in zip(columns, positions):
+            res[c] = df.iloc[:, pos].to_numpy(copy=True)
         # add additional columns
         for a in additional:
-            col = self._create_cds_col_from_df(a, c_df)
-            c_df[a[0]] = col
-
-        res = ColumnDataSource.from_df(c_df)
-        del res["level_0"]
+            res[a[0]] = self._create_cds_col_from_df(a, df)
         return res
 
+    def _get_idx_map(self):
+        '''
+        Returns a dict with the row in ColumnDataSource for every index
+
+        The dict is only created again if the index column was replaced
+        or changed by a stream.
+        '''
+        idx_col = self._cds.data['index']
+        key = (len(idx_col), idx_col[0], idx_col[-1]) if len(idx_col) else ()
+        if (self._idx_map is None
+                or self._idx_map[0] is not idx_col
+                or self._idx_map[1] != key):
+            idx_map = {d: i for i, d in enumerate(idx_col)}
+            self._idx_map = (idx_col, key, idx_map)
+        return self._idx_map[2]
+
     def get_cds_patchdata_from_series(self, idx, series, fillnan=[]):
         '''
         Creates patch data from a pandas Series
@@ -164,18 +193,23 @@ class CDSObject:
         s_data = defaultdict(list)
         columns, additional = self._get_cds_cols()
 
-        idx_map = {d: idx for idx, d in enumerate(self._cds.data['index'])}
-        # get the index in cds for series index
-        if idx in idx_map:
-            idx = idx_map[idx]
+        # get the index in cds for series index, most updates are
+        # for the last row, so it is checked first
+        idx_col = self._cds.data['index']
+        if len(idx_col) and idx_col[-1] == idx:
+            idx = len(idx_col) - 1
         else:
-            idx = False
+            idx_map = self._get_idx_map()
+            if idx in idx_map:
+                idx = idx_map[idx]
+            else:
+                idx = False
 
         # create patch or stream data based on given series
         if idx is not False:
             # ensure datetime is checked for changes
-            if 'datetime' not in columns:
-                columns.append('datetime')
+            if 'datetime' not in self._cds_cols_set:
+                columns = columns + ['datetime']
 
             cds_val = None
             for c in columns:
@@ -206,5 +240,9 @@ class CDSObject:
         Resets the ColumnDataSource and other config to default
         '''
         self._cds = ColumnDataSource()
+        self._idx_map = None
         self._cds_cols = []
+        self._cds_cols_str = []
+        self._cds_cols_additional = []
+        self._cds_cols_set = set()
         self.set_cds_col(self._cds_cols_default)
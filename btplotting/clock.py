@@ -1,7 +1,8 @@
+import numpy as np
 import pandas as pd
 import backtrader as bt
 
-from bisect import bisect_left
+from bisect import bisect_left, bisect_right
 from datetime import timedelta
 
 from .utils import get_dataname, get_source_id
@@ -40,6 +41,8 @@ class DataClockHandler:
         self._rightedge = data.p._get('rightedge', True)
 
         self._clk_cache = None
+        # last requested range of clock values as array
+        self._clk_floats = None
         self.last_endidx = -1
 
     def __len__(self):
@@ -73,10 +76,12 @@ class DataClockHandler:
 
         # self._clk_cache = sorted(set(self._clk.array[-len(self._clk) + 1: last_index]))
         self._clk_cache = sorted(set(self._clk.array[: last_index]))
+        self._clk_floats = None
 
     def uinit_clk(self, last_endidx):
         assert self._clk_cache, "init_clk should have been called"
         self._clk_cache = None
+        self._clk_floats = None
         self.last_endidx = last_endidx
 
     # def _get_clk(self):
@@ -98,84 +103,100 @@ class DataClockHandler:
         # if no dataname provided, use first data
         return strategy.datetime, strategy.data._tz
 
-    def _align_slice(self, slicedata, startidx=None, endidx=None,
-                     rightedge=True):
+    def _num2date(self, val, localized=True):
         '''
-        Aligns a slice to the clock
+        Returns a datetime object for given float value
         '''
-        res = []
-
-        # loop through timestamps of curent clock as float values
-        dtlist = self.get_dt_list(startidx, endidx, asfloat=True)
-        # initialize last index used in slicedata
-        l_idx = -1 if not len(slicedata['float']) else 0
-        maxidx = min(len(slicedata['float']), len(slicedata['value'])) - 1
-        for i in range(0, len(dtlist)):
-            # set initial value for this candle
-            t_val = float('nan')  # target candle value
-            if rightedge:
-                t_end = dtlist[i]
-                t_start = t_end
-                if len(dtlist) > 1:
-                    if i == 0:
-                        t_start = t_end - (dtlist[1] - dtlist[0])
-                    else:
-                        t_start = dtlist[i - 1]
-            else:
-                t_start = dtlist[i]
-                t_end = t_start
-                if i < len(dtlist) - 1:
-                    t_end = dtlist[i + 1]
-                elif len(dtlist) > 1:
-                    t_end = t_start + dtlist[1] - dtlist[0]
-            # align slicedata to target clock
-            while True:
-                # there is no data to align, just set nan values
-                if l_idx < 0:
-                    res.append(t_val)
-                    break
-                # all candles from data consumed
-                if (l_idx > maxidx):
-                    break
-                # get duration of current candle
-                # current values from data
-                c_val = slicedata['value'][l_idx]
-                if rightedge:
-                    c_end = slicedata['float'][l_idx]
-                    c_start = None
-                    if maxidx > 1:
-                        if l_idx == 0:
-                            c_start = (c_end - (slicedata['float'][1]
-                                                - slicedata['float'][0]))
-                        else:
-                            c_start = slicedata['float'][l_idx - 1]
-                else:
-                    c_start = slicedata['float'][l_idx]
-                    c_end = None
-                    if l_idx < maxidx - 1:
-                        c_end = slicedata['float'][l_idx + 1]
-                    elif maxidx > 1:
-                        c_end = (c_start + (slicedata['float'][1]
-                                            - slicedata['float'][0]))
-                # check if value belongs to next candle, if current value
-                # belongs to next target candle don't use this value and
-                # stop here and use previously set value
-                if c_start and c_start >= t_end:
-                    break
-                # forward until start of target start is readched
-                # move forward in source data and remember the last value
-                # of the candle, also don't process further if last candle
-                # and after start of target
-                if c_end and c_end <= t_start:
-                    l_idx += 1
-                    continue
-                # set target value
-                if c_val == c_val:
-                    t_val = c_val
-                # increment index in slice data if current candle consumed
-                l_idx += 1
-            # append the set value to aligned list with values
-            res.append(t_val)
+        return bt.num2date(val, tz=None if not localized else self._tz)
+
+    def _get_clk_floats(self, startidx, endidx):
+        '''
+        Returns the clock values from startidx to endidx as a float array
+
+        All lines are aligned to the same range of the clock, so the
+        last requested array is kept until the clock is initialized again
+        '''
+        key = (startidx, endidx)
+        if self._clk_floats is None or self._clk_floats[0] != key:
+            arr = np.asarray(
+                self._clk_cache[startidx:endidx + 1], dtype=np.float64)
+            # the array is shared, so it should not be changed
+            arr.flags.writeable = False
+            self._clk_floats = (key, arr)
+        return self._clk_floats[1]
+
+    def _ffill(self, arr):
+        '''
+        Forward fills nan values in given array
+        '''
+        # index of last valid value for every position
+        idx = np.where(np.isnan(arr), 0, np.arange(len(arr)))
+        np.maximum.accumulate(idx, out=idx)
+        return arr[idx]
+
+    def _get_align_idx(self, floats, startidx=None, endidx=None,
+                       rightedge=True):
+        '''
+        Returns the timestamps of the clock, the index of the candle
+        every timestamp belongs to and a mask of the timestamps which
+        are in range of the clock
+
+        The result only depends on the timestamps, so it can be used
+        for all lines of an object.
+        '''
+        # timestamps of curent clock as float values
+        dtlist = self._get_clk_floats(startidx, endidx)
+        count = len(floats)
+        if not count or not len(dtlist):
+            # there is no data to align
+            return dtlist, None, None
+
+        # duration of a candle, used for the candles at the edges
+        t_delta = dtlist[1] - dtlist[0] if len(dtlist) > 1 else 0.
+        c_delta = floats[1] - floats[0] if count > 1 else t_delta
+        if rightedge:
+            # candles are defined by their end, a value belongs to the
+            # first target candle ending after the start of the value
+            c_start = np.empty(count)
+            c_start[0] = floats[0] - c_delta
+            c_start[1:] = floats[:-1]
+            t_idx = np.searchsorted(dtlist, c_start, side='right')
+            # skip values ending before the first target candle
+            valid = (t_idx < len(dtlist)) & ~(
+                (t_idx == 0) & (floats <= dtlist[0] - t_delta))
+        else:
+            # candles are defined by their start, a value belongs to the
+            # last target candle starting before the value
+            c_end = np.empty(count)
+            c_end[:-1] = floats[1:]
+            c_end[-1] = floats[-1] + c_delta
+            t_idx = np.maximum(
+                np.searchsorted(dtlist, floats, side='right') - 1, 0)
+            # skip values ending before the first target candle and
+            # values starting after the last target candle
+            valid = ((c_end > dtlist[0])
+                     & (floats < dtlist[-1] + t_delta))
+        return dtlist, t_idx, valid
+
+    def _align_values(self, values, dtlist, t_idx, valid):
+        '''
+        Aligns values to the clock using the result of _get_align_idx
+
+        If multiple values belong to the same candle, the last valid
+        value will be used.
+        '''
+        res = np.full(len(dtlist), np.nan)
+        if t_idx is None:
+            # there is no data to align, just return nan values
+            return res
+        valid = valid & ~np.isnan(values)
+
+        # set the last valid value for every target candle
+        t_idx = t_idx[valid]
+        values = values[valid]
+        if len(t_idx):
+            last = np.append(t_idx[1:] != t_idx[:-1], True)
+            res[t_idx[last]] = values[last]
         return res
 
     def get_idx_for_dt(self, dt):
@@ -213,9 +234,7 @@ class DataClockHandler:
         '''
         clk = self._clk_cache
         assert clk, "wrong"
-        return bt.num2date(
-            clk[idx],
-            tz=None if not localized else self._tz)
+        return self._num2date(clk[idx], localized)
 
     def get_idx_list(self, startidx=None, endidx=None, preserveidx=True):
         '''
@@ -229,8 +248,8 @@ class DataClockHandler:
             endidx = min(len(clk), endidx)
         if preserveidx:
             assert endidx is not None, "wrong"
-            return [int(x) for x in range(startidx, endidx + 1)]
-        return [int(x) for x in range(endidx - startidx + 1)]
+            return list(range(startidx, endidx + 1))
+        return list(range(endidx - startidx + 1))
 
     def get_dt_list(self, startidx=None, endidx=None, asfloat=False,
                     localized=True):
@@ -239,40 +258,58 @@ class DataClockHandler:
         '''
         clk = self._clk_cache
         assert clk, "wrong"
-        dtlist = []
-        for i in self.get_idx_list(startidx, endidx):
-            val = clk[i]
-            if not asfloat:
-                val = bt.num2date(val, tz=None if not localized else self._tz)
-            dtlist.append(val)
-        return dtlist
-
-    def get_slice(self, line, startdt=None, enddt=None, obj_clk=None):
+        idx_list = self.get_idx_list(startidx, endidx)
+        if not idx_list:
+            return []
+        # the indexes are continuous, so the values can be sliced
+        dtlist = clk[idx_list[0]:idx_list[-1] + 1]
+        if asfloat:
+            return dtlist
+        return [self._num2date(val, localized) for val in dtlist]
+
+    def _get_slice_idx(self, startdt=None, enddt=None, obj_clk=None):
         '''
-        Returns a slice from given line
+        Returns the timestamps of a slice and the positions of the
+        values in lines using obj_clk
 
-        This method is used to slice something from another clock for later
-        alignment in another clock.
+        The result can be used for all lines of an object.
         '''
         clk = self._clk_cache
         assert clk, "wrong"
-        res = {'float': [], 'value': []}
         startidx, endidx = self.get_start_end_idx(startdt, enddt)
-        for i in self.get_idx_list(startidx, endidx):
-            res['float'].append(clk[i])
-            if obj_clk is None:
-                if i < len(line.array):
-                    res['value'].append(line.array[i])
-                else:
-                    res['value'].append(float('nan'))
-            else:
-                idx = self.get_idx(obj_clk.array, clk[i])
-
-                if obj_clk.array[idx] == clk[i]:
-                    res['value'].append(line.array[idx])
-                else:
-                    res['value'].append(float('nan'))
-        return res
+        floats = self._get_clk_floats(startidx, endidx)
+        if not len(floats):
+            return floats, 0, 0, None, None
+        if obj_clk is None:
+            # line is aligned to the clock, values at the same index
+            # are used
+            return floats, startidx, endidx + 1, None, None
+        # only the part of the object clock in the range of the
+        # slice is used
+        start = bisect_left(obj_clk.array, floats[0])
+        end = bisect_right(obj_clk.array, floats[-1])
+        obj_floats = np.asarray(obj_clk.array[start:end], dtype=np.float64)
+        # values are only used where the object clock has the
+        # same timestamp
+        idx = np.searchsorted(obj_floats, floats, side='left')
+        found = idx < len(obj_floats)
+        found[found] = obj_floats[idx[found]] == floats[found]
+        return floats, start, end, idx, found
+
+    def _get_slice_values(self, line, floats, start, end, idx, found):
+        '''
+        Returns the values of a line using the result of _get_slice_idx
+        '''
+        values = np.full(len(floats), np.nan)
+        # line values are copied, so the line can be extended
+        # while the slice is being used
+        line_values = np.asarray(line.array[start:end], dtype=np.float64)
+        if idx is None:
+            values[:len(line_values)] = line_values
+        else:
+            found = found & (idx < len(line_values))
+            values[found] = line_values[idx[found]]
+        return values
 
     def get_idx(self, obj_clk, clk_value):
         idx = bisect_left(obj_clk, clk_value)
@@ -283,6 +320,16 @@ class DataClockHandler:
         '''
         Returns data from object aligned to clock
         '''
+        return pd.DataFrame(self.get_data_cols(
+            obj, startidx, endidx,
+            fillnan=fillnan, skipnan=skipnan, obj_clk=obj_clk))
+
+    def get_data_cols(self, obj, startidx=None, endidx=None,
+                      fillnan=[], skipnan=[], obj_clk=None):
+        '''
+        Returns data from object aligned to clock as a dict
+        with a numpy array for every column
+        '''
         clk = self._clk_cache
         assert clk, "wrong"
 
@@ -291,7 +338,19 @@ class DataClockHandler:
 
         # dataname = get_dataname(obj)
         # tmpclk = DataClockHandler(self._strategy, dataname)
-        df = pd.DataFrame()
+        # positions of the values are the same for all lines of
+        # the object, so they are only calculated once
+        slice_idx = self._get_slice_idx(slice_startdt, slice_enddt, obj_clk)
+        floats = slice_idx[0]
+        # if the object is using the clock and the slice has the same
+        # range, every value is already at the candle it belongs to
+        aligned = (obj_clk is None
+                   and slice_idx[1:3] == (startidx, endidx + 1)
+                   and bool(np.all(floats[1:] > floats[:-1])))
+        if not aligned:
+            align_idx = self._get_align_idx(
+                floats, startidx, endidx, rightedge=self._rightedge)
+        data_cols = {}
         source_id = get_source_id(obj)
         for lineidx, line in enumerate(obj.lines):
             alias = obj._getlinealias(lineidx)
@@ -302,16 +361,15 @@ class DataClockHandler:
             else:
                 name = get_source_id(line)
 
-            slicedata = self.get_slice(line, slice_startdt, slice_enddt, obj_clk)
-
-            data = self._align_slice(
-                slicedata, startidx, endidx, rightedge=self._rightedge)
-            df[name] = data
+            data = self._get_slice_values(line, *slice_idx)
+            if not aligned:
+                data = self._align_values(data, *align_idx)
             # make sure all data is filled correctly,
             # either skip if skipnan
             # or forward fill if not fillnan
             if name in skipnan:
                 pass
             elif name not in fillnan:
-                df[name] = df[name].ffill()
-        return df
+                data = self._ffill(data)
+            data_cols[name] = data
+        return data_cols
@@ -5,7 +5,6 @@ import pkgutil
 from functools import partial
 from enum import Enum
 
-from typing import List
 import backtrader as bt
 import pandas as pd
 
@@ -15,7 +14,8 @@ from bokeh.models import HoverTool, CrosshairTool, Span, \
     DatetimeTickFormatter, CustomJSTickFormatter
 
 from .cds import CDSObject
-from .utils import get_source_id, get_clock_obj
+from .utils import get_source_id, get_clock_obj, get_dataname, \
+    get_datanames
 from .helper.cds_ops import cds_op_gt, cds_op_lt, cds_op_non, \
     cds_op_color
 from .helper.plot import convert_color, sanitize_source_name
@@ -125,11 +125,17 @@ class FigurePage(CDSObject):
         super(FigurePage, self).__init__(['datetime'])
         self.scheme = scheme
         self.figures = []
+        # figures in the order they are displayed
+        self.sorted_figures = []
+        # x range shared by all figures
+        self.x_range = None
         self.analyzers = []
         self.strategy = obj if isinstance(obj, bt.Strategy) else None
         self.optreturn = obj if isinstance(obj, bt.OptReturn) else None
         # the whole generated model will we attached here after plotting
         self.model = None
+        # datanames of strategy, resolved on first use
+        self._datanames = {}
         # add hover container if strategy
         self.hover = None
         self._set_hover_container()
@@ -160,6 +166,15 @@ class FigurePage(CDSObject):
             crosshair = CrosshairTool(overlay=width)
             f.figure.add_tools(crosshair, crosshair_shared)
 
+    def get_datanames(self, onlyplotable=True):
+        '''
+        Returns the names of all data sources of the strategy
+        '''
+        if onlyplotable not in self._datanames:
+            self._datanames[onlyplotable] = get_datanames(
+                self.strategy, onlyplotable)
+        return self._datanames[onlyplotable]
+
     # def set_cds_columns_from_df(self, df):
     #     '''
     #     Setup the FigurePage and Figures from DataFrame
@@ -185,7 +200,10 @@ class FigurePage(CDSObject):
         '''
         self.cds_reset()
         self.figures = []
+        self.sorted_figures = []
+        self.x_range = None
         self.analyzers = []
+        self._datanames = {}
         self._set_hover_container()
 
 
@@ -218,6 +236,9 @@ class Figure(CDSObject):
     _alpha = 1.0
     _bar_width = 0.5
 
+    # code of the x axis tick formatter, loaded on first use
+    _formatter_code = None
+
     def __init__(self, fp, scheme, master, childs, type=None):
         super(Figure, self).__init__([])
         self._fp = fp
@@ -226,6 +247,8 @@ class Figure(CDSObject):
         self._hover = None
         self._coloridx = collections.defaultdict(lambda: -1)
         self._type = type
+        # dataname of master, resolved on first use
+        self._dataname = None
         self._datacols = []
         self.master = master
         self.childs = childs
@@ -327,9 +350,10 @@ class Figure(CDSObject):
 
         # mechanism for proper date axis without gaps, thanks!
         # https://groups.google.com/a/continuum.io/forum/#!topic/bokeh/t3HkalO4TGA
-        formatter_code = pkgutil.get_data(
-            __name__,
-            'templates/js/tick_formatter.js').decode()
+        if Figure._formatter_code is None:
+            Figure._formatter_code = pkgutil.get_data(
+                __name__,
+                'templates/js/tick_formatter.js').decode()
         dt_formatter = DatetimeTickFormatter(
             microseconds='%fus',
             milliseconds='%3Nms',
@@ -347,7 +371,7 @@ class Figure(CDSObject):
             args=dict(axis=f.xaxis[0],
                       source=self.cds,
                       formatter=dt_formatter),
-            code=formatter_code)
+            code=Figure._formatter_code)
 
         h = HoverTool(
             tooltips=[
@@ -693,9 +717,17 @@ class Figure(CDSObject):
         Returns the FigureType of this Figure
         '''
         if self._type is None:
-            return FigureType.get_type(self.master)
+            self._type = FigureType.get_type(self.master)
         return self._type
 
+    def get_dataname(self):
+        '''
+        Returns the dataname of the master of this Figure
+        '''
+        if self._dataname is None:
+            self._dataname = get_dataname(self.master)
+        return self._dataname
+
     def get_plotorder(self):
         '''
         Returns the plotorder of this Figure
@@ -912,16 +944,31 @@ class Figure(CDSObject):
         Apply additional configuration after the figure was plotted
         Note: this method will be called from BacktraderPlotting
         '''
+        # link x axis, the first figure provides the range for all
+        # other figures of the figurepage
+        if self._fp.x_range is None:
+            self._fp.x_range = self.figure.x_range
+        else:
+            self.figure.x_range = self._fp.x_range
         # apply legend configuration to figure
+        scheme = self._scheme
         legend = self.figure.legend
-        legend.background_fill_alpha = self._scheme.legendtrans
-        legend.click_policy = self._scheme.legend_click
-        legend.location = self._scheme.legend_location
-        legend.background_fill_color = self._scheme.legend_background_color
-        legend.label_text_color = self._scheme.legend_text_color
-        legend.orientation = self._scheme.legend_orientation
-
-    def set_cds(self, data_clock, startidx, endidx, dt_idx, int_idx) -> List[pd.DataFrame]:
+        legend.background_fill_alpha = scheme.legendtrans
+        legend.click_policy = scheme.legend_click
+        legend.location = scheme.legend_location
+        legend.background_fill_color = scheme.legend_background_color
+        legend.label_text_color = scheme.legend_text_color
+        legend.orientation = scheme.legend_orientation
+
+    def set_cds(self, data_clock, startidx, endidx, dt_idx, int_idx,
+                fillcds=True, objs_data=None) -> dict:
+        '''
+        Generates the data for all objects of this figure and returns
+        the columns of all objects as a dict
+        objs_data can be a dict shared between figures, data of objects
+        already in objs_data will be reused and new data added to it.
+        data is only reused if it was generated with the same settings
+        '''
         fillnan = self.fillnan()
         skipnan = self.skipnan()
 
@@ -929,25 +976,28 @@ class Figure(CDSObject):
         if len(data_clock) != len(self.master) and issubclass(type(self.master), bt.AbstractDataBase):
             obj_clk = self.master.datetime
 
-        df_objs = []
+        if objs_data is None:
+            objs_data = {}
+        # datetime and prepared index are special cases
+        # and available in every row
+        data = {
+            'index': int_idx,
+            'datetime': dt_idx}
+        # settings used to generate data of objects
+        settings = (tuple(fillnan), tuple(skipnan), id(obj_clk))
         for obj in [self.master] + self.childs:
-            df_data = data_clock.get_data(
-                obj, startidx, endidx,
-                fillnan=fillnan,
-                skipnan=skipnan, obj_clk=obj_clk)
-
-            df_objs.append(df_data)
-
-            # create dataframe with datetime and prepared index
-            # the index will be applied at the end after data is
-            # set
-        f_df = pd.DataFrame(
-            data={
-                'index': pd.Series(int_idx, dtype='int64'),
-                'datetime': pd.Series(dt_idx, dtype='datetime64[ns]')})
-
-        # set index and return dataframe
-        f_df = f_df.join(df_objs)
-        self.set_cds_columns_from_df(f_df)
-
-        return df_objs
+            key = (id(obj),) + settings
+            obj_data = objs_data.get(key)
+            if obj_data is None:
+                obj_data = data_clock.get_data_cols(
+                    obj, startidx, endidx,
+                    fillnan=fillnan,
+                    skipnan=skipnan, obj_clk=obj_clk)
+                objs_data[key] = obj_data
+            data.update(obj_data)
+
+        # create dataframe with all data at once and set cds
+        if fillcds:
+            self.set_cds_columns_from_df(pd.DataFrame(data))
+
+        return data
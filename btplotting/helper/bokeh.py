@@ -1,12 +1,25 @@
 from jinja2 import Environment, PackageLoader
 
+# environment for templates, created on first use
+_env = None
+
+
+def get_template(template):
+    '''
+    Returns the template with the given name, the environment
+    is shared, so templates are only loaded once
+    '''
+    global _env
+    if _env is None:
+        _env = Environment(loader=PackageLoader('btplotting', 'templates'))
+    return _env.get_template(template)
+
 
 def generate_stylesheet(scheme, template='basic.css.j2'):
     '''
     Generates stylesheet with values from scheme
     '''
-    env = Environment(loader=PackageLoader('btplotting', 'templates'))
-    templ = env.get_template(template)
+    templ = get_template(template)
 
     css = templ.render(scheme.__dict__)
     return css
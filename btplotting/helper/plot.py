@@ -1,5 +1,7 @@
+import re
 
-import matplotlib.colors
+
+_re_hex_color = re.compile('#[0-9a-fA-F]{6}')
 
 
 def convert_color(color):
@@ -12,6 +14,12 @@ def convert_color(color):
         hex_string = '#{0:02x}{0:02x}{0:02x}'.format(val)
         return hex_string
     except ValueError:
+        # html color codes are used as they are
+        if isinstance(color, str) and _re_hex_color.fullmatch(color):
+            return color.lower()
+        # matplotlib is only imported when needed, since importing
+        # it takes a noticeable amount of time
+        import matplotlib.colors
         return matplotlib.colors.to_hex(color)
 
 
@@ -260,15 +260,17 @@ class LiveClient:
             tab = t(self._app, self._figurepage, self)
             if tab.is_useable():
                 tab_panels.append(tab.get_tab_panel())
-        self._get_tabs().tabs = list(filter(None.__ne__, tab_panels))
+        self._get_tabs().tabs = [t for t in tab_panels if t is not None]
         self.refresh()
 
-    def next(self):
+    def next(self, strategylen=None):
         if self._interval != 0:
             return
-        if len(self._strategy) == self._lastlen:
+        if strategylen is None:
+            strategylen = len(self._strategy)
+        if strategylen == self._lastlen:
             return
-        self._lastlen = len(self._strategy)
+        self._lastlen = strategylen
         self._datahandler.update()
 
     def stop(self):
@@ -63,30 +63,6 @@ class LiveDataHandler:
                     f.cds.stream(s_data, self._get_data_stream_length())
                     self._lastidx = s_data['index'][-1]
 
-        '''
-        # take all rows from datastore that were not yet streamed
-        update_df = self._datastore[self._datastore.index >= self._lastidx]
-        if not update_df.shape[0]:
-            return
-
-        # store last index of streamed data
-        self._lastidx = update_df.index[-1]
-
-        # create stream data for figurepage
-        data = fp.get_cds_streamdata_from_df(update_df)
-        if data:
-            _logger.debug(f'Sending stream for figurepage: {data}')
-            fp.cds.stream(data, self._get_data_stream_length())
-
-        # create stream df for every figure
-        for f in fp.figures:
-            data = f.get_cds_streamdata_from_df(update_df)
-            if data:
-                _logger.debug(f'Sending stream for figure: {data}')
-                f.cds.stream(data, self._get_data_stream_length())
-        self._lastidx = self._datastore.index[-1]
-        '''
-
     def _fill(self):
         '''
         Fills datastore with latest values
@@ -101,16 +77,25 @@ class LiveDataHandler:
         # after this, all cds will already contain data
         fp.set_cds_columns_from_df(self._datastore)
 
+    def _set_index(self, df):
+        '''
+        Uses the clock index as row labels, so rows can be matched with
+        the rows in ColumnDataSources
+        '''
+        df.index = df['index'].to_numpy()
+        return df
+
     def _set_data(self, data, idx=None):
         '''
         Replaces or appends data to datastore
         '''
         if isinstance(data, pd.DataFrame):
-            self._datastore = data
+            self._datastore = self._set_index(data)
             self._lastidx = -1
         elif isinstance(data, pd.Series):
             if idx is None:
-                self._datastore = self._datastore.append(data)
+                self._datastore = pd.concat(
+                    [self._datastore, data.to_frame().T])
             else:
                 self._datastore.loc[idx] = data
         else:
@@ -130,15 +115,14 @@ class LiveDataHandler:
         '''
         Request to update data with given data
         '''
-        for idx, row in data.iterrows():
+        for idx, row in self._set_index(data).iterrows():
             if (idx in self._datastore.index):
                 self._set_data(row, idx)
-                self._patches[idx] = row
             else:
                 self._set_data(row)
-
-        # if self._datastore is not None:
-        #     self._datastore.drop_duplicates("datetime", keep='last', inplace=True) 
+            # rows already in the ColumnDataSource will be patched, new
+            # rows will be streamed
+            self._patches[idx] = row
 
         self._push()
 
@@ -175,14 +159,16 @@ class LiveDataHandler:
         lastavailidx = app.get_last_idx(figid)
         # if there is more new data then lookback length
         # don't load from last index but from end of data
+        # the data is only used to patch and stream, so the
+        # ColumnDataSources are not filled when getting the data
         if (lastidx < 0 or lastavailidx - lastidx > (2 * lookback)):
-            data = app.get_data(back=lookback)
+            data = app.get_data(back=lookback, fillcds=False)
         # if there is just some new data (less then lookback)
         # load from last index, so no data is skipped
         elif lastidx <= lastavailidx:
             startidx = max(0, lastidx - 2)
             # start = data_clock.get_dt_at_idx(startidx)
-            data = app.get_data(startidx=startidx)
+            data = app.get_data(startidx=startidx, fillcds=False)
         # if any new data was loaded
         if data is not None:
             self._process_data(data)
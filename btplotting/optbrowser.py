@@ -12,7 +12,7 @@ from bokeh.layouts import column
 from bokeh.models.widgets import DataTable, TableColumn, \
     NumberFormatter, StringFormatter
 
-from .webapp import Webapp
+from .analyzer_tables import inject_datatables
 
 
 class OptBrowser:
@@ -20,6 +20,8 @@ class OptBrowser:
                  num_result_limit=None, sortcolumn=None,
                  sortasc=True, address='localhost', port=81,
                  autostart=False, iplot=True):
+        # initialize analyzer tables on first use
+        inject_datatables()
         self._usercolumns = {} if usercolumns is None else usercolumns
         self._num_result_limit = num_result_limit
         self._app = app
@@ -32,6 +34,8 @@ class OptBrowser:
         self._iplot = iplot
 
     def start(self, ioloop=None):
+        # bokeh server is only imported when the browser is started
+        from .webapp import Webapp
         webapp = Webapp(
             'Backtrader Optimization Result',
             'basic.html.j2',
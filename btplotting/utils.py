@@ -27,7 +27,7 @@ def get_plotobjs(strategy, include_non_plotable=False,
         objs[d] = []
     # next loop through all ind and obs and set them to
     # the corresponding data clock
-    for obj in itertools.chain(inds, obs):
+    for obj in itertools.chain.from_iterable((inds, obs)):
         # check for base classes
         if not isinstance(obj, (bt.IndicatorBase,
                                 bt.MultiCoupler,
@@ -7,9 +7,7 @@ from bokeh.server.server import Server
 from bokeh.io import show
 from bokeh.util.browser import view
 from bokeh.server.views.ws import WSHandler
-from jinja2 import Environment, PackageLoader
-
-from .helper.bokeh import generate_stylesheet
+from .helper.bokeh import generate_stylesheet, get_template
 
 
 def check_origin_overwrite(self, origin):
@@ -29,6 +27,16 @@ class Webapp:
         self._port = port
         self._autostart = autostart
         self._iplot = iplot
+        self._template = None
+
+    def _get_template(self):
+        '''
+        Returns the html template, the template is only loaded once
+        and shared by all documents
+        '''
+        if self._template is None:
+            self._template = get_template(self._html_template)
+        return self._template
 
     def start(self, ioloop=None):
         '''
@@ -44,11 +52,11 @@ class Webapp:
             doc.title = self._title
 
             # set document template
+            # the template is shared by all documents, so the time
+            # is set as a variable of the document
             now = datetime.now()
-            env = Environment(loader=PackageLoader('btplotting', 'templates'))
-            templ = env.get_template(self._html_template)
-            templ.globals['now'] = now.strftime('%Y-%m-%d %H:%M:%S')
-            doc.template = templ
+            doc.template = self._get_template()
+            doc.template_variables['now'] = now.strftime('%Y-%m-%d %H:%M:%S')
             doc.template_variables['stylesheet'] = generate_stylesheet(
                 self._scheme)
             model = self._model_factory_fnc(doc)
@@ -95,4 +103,6 @@ class Webapp:
             server.run_until_shutdown()
         else:
             server.start()
-            ioloop.start()
+            # the ioloop may already be running when it is shared
+            if not ioloop.asyncio_loop.is_running():
+                ioloop.start()
@@ -0,0 +1,233 @@
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+from btplotting.clock import DataClockHandler
+from btplotting.utils import get_source_id
+
+from testcommon import getdatadir
+
+
+def _get_slice(clk, line, startidx, endidx, obj_clk=None):
+    '''
+    Reference implementation of slicing a line using loops
+    '''
+    res = {'float': [], 'value': []}
+    for i in range(startidx, endidx + 1):
+        res['float'].append(clk[i])
+        if obj_clk is None:
+            if i < len(line.array):
+                res['value'].append(line.array[i])
+            else:
+                res['value'].append(float('nan'))
+        else:
+            idx = np.searchsorted(obj_clk.array, clk[i])
+            if idx < len(obj_clk.array) and obj_clk.array[idx] == clk[i]:
+                res['value'].append(line.array[idx])
+            else:
+                res['value'].append(float('nan'))
+    return res
+
+
+def _align_slice(dtlist, slicedata, rightedge=True):
+    '''
+    Reference implementation of aligning a slice using loops
+    '''
+    res = []
+    l_idx = -1 if not len(slicedata['float']) else 0
+    maxidx = min(len(slicedata['float']), len(slicedata['value'])) - 1
+    for i in range(0, len(dtlist)):
+        t_val = float('nan')
+        if rightedge:
+            t_end = dtlist[i]
+            t_start = t_end
+            if len(dtlist) > 1:
+                if i == 0:
+                    t_start = t_end - (dtlist[1] - dtlist[0])
+                else:
+                    t_start = dtlist[i - 1]
+        else:
+            t_start = dtlist[i]
+            t_end = t_start
+            if i < len(dtlist) - 1:
+                t_end = dtlist[i + 1]
+            elif len(dtlist) > 1:
+                t_end = t_start + dtlist[1] - dtlist[0]
+        while True:
+            if l_idx < 0:
+                break
+            if l_idx > maxidx:
+                break
+            c_val = slicedata['value'][l_idx]
+            if rightedge:
+                c_end = slicedata['float'][l_idx]
+                c_start = None
+                if maxidx > 1:
+                    if l_idx == 0:
+                        c_start = (c_end - (slicedata['float'][1]
+                                            - slicedata['float'][0]))
+                    else:
+                        c_start = slicedata['float'][l_idx - 1]
+            else:
+                c_start = slicedata['float'][l_idx]
+                c_end = None
+                if l_idx < maxidx - 1:
+                    c_end = slicedata['float'][l_idx + 1]
+                elif maxidx > 1:
+                    c_end = (c_start + (slicedata['float'][1]
+                                        - slicedata['float'][0]))
+            if c_start and c_start >= t_end:
+                break
+            if c_end and c_end <= t_start:
+                l_idx += 1
+                continue
+            if c_val == c_val:
+                t_val = c_val
+            l_idx += 1
+        res.append(t_val)
+    return res
+
+
+def _get_data_cols(clock, obj, startidx, endidx, fillnan=[], skipnan=[],
+                   obj_clk=None):
+    '''
+    Reference implementation of DataClockHandler.get_data_cols
+    '''
+    clk = clock._clk_cache
+    dtlist = clk[startidx:endidx + 1]
+    source_id = get_source_id(obj)
+    res = {}
+    for lineidx, line in enumerate(obj.lines):
+        alias = obj._getlinealias(lineidx)
+        if isinstance(obj, bt.AbstractDataBase):
+            if alias == 'datetime':
+                continue
+            name = source_id + alias
+        else:
+            name = get_source_id(line)
+        slicedata = _get_slice(clk, line, startidx, endidx, obj_clk)
+        data = pd.Series(
+            _align_slice(dtlist, slicedata, clock._rightedge),
+            dtype=np.float64)
+        if name in skipnan:
+            pass
+        elif name not in fillnan:
+            data = data.ffill()
+        res[name] = data.to_numpy()
+    return res
+
+
+def _get_strategy(feed):
+    df = pd.read_csv(getdatadir('nvda-1999-2014.txt'),
+                     parse_dates=['Date'], index_col='Date')
+    df = df.loc['2014-01-01':'2014-06-30']
+    clock = df
+    if feed == 'identical':
+        other = df
+    elif feed == 'finer':
+        # multiple values of the other data belong to one candle
+        clock = df.iloc[::5]
+        other = df
+    elif feed == 'late':
+        other = df.iloc[20:]
+    elif feed == 'early':
+        other = df.iloc[:-20]
+    elif feed == 'gaps':
+        other = df.iloc[[i for i in range(len(df)) if i % 3 != 1]]
+    else:
+        raise Exception(f'Unknown feed {feed}')
+
+    class Strategy(bt.Strategy):
+        def __init__(self):
+            bt.indicators.SMA(self.datas[1], period=5)
+
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(Strategy)
+    cerebro.adddata(bt.feeds.PandasData(dataname=clock), name='clock')
+    cerebro.adddata(bt.feeds.PandasData(dataname=other), name='other')
+    return cerebro.run()[0]
+
+
+def _assert_cols_equal(res, expected):
+    assert list(res) == list(expected)
+    for name in expected:
+        np.testing.assert_array_equal(res[name], expected[name])
+
+
+@pytest.mark.parametrize(
+    'feed', ['identical', 'late', 'early', 'gaps', 'finer'])
+@pytest.mark.parametrize('rightedge', [True, False])
+@pytest.mark.parametrize('back', [None, 30])
+def test_get_data_cols(feed, rightedge, back):
+    strategy = _get_strategy(feed)
+    data = strategy.datas[1]
+    objs = [data] + [x for x in strategy.getindicators()]
+
+    clock = DataClockHandler(strategy, 'clock')
+    clock._rightedge = rightedge
+    clock.init_clk()
+    startidx, endidx = clock.get_start_end_idx(back=back)
+    obj_clk = None
+    if len(clock) != len(data):
+        obj_clk = data.datetime
+
+    for obj in objs:
+        res = clock.get_data_cols(obj, startidx, endidx, obj_clk=obj_clk)
+        expected = _get_data_cols(
+            clock, obj, startidx, endidx, obj_clk=obj_clk)
+        _assert_cols_equal(res, expected)
+    clock.uinit_clk(endidx)
+
+
+@pytest.mark.parametrize('feed', ['identical', 'gaps'])
+def test_get_data_cols_fillnan_skipnan(feed):
+    strategy = _get_strategy(feed)
+    data = strategy.datas[1]
+    source_id = get_source_id(data)
+    fillnan = [source_id + 'close']
+    skipnan = [source_id + 'volume']
+
+    clock = DataClockHandler(strategy, 'clock')
+    clock.init_clk()
+    startidx, endidx = clock.get_start_end_idx()
+    obj_clk = None
+    if len(clock) != len(data):
+        obj_clk = data.datetime
+
+    res = clock.get_data_cols(data, startidx, endidx, fillnan=fillnan,
+                              skipnan=skipnan, obj_clk=obj_clk)
+    expected = _get_data_cols(clock, data, startidx, endidx, fillnan=fillnan,
+                              skipnan=skipnan, obj_clk=obj_clk)
+    _assert_cols_equal(res, expected)
+    if feed == 'gaps':
+        # gaps are only kept in columns which are not filled
+        assert np.isnan(res[source_id + 'close']).any()
+        assert np.isnan(res[source_id + 'volume']).any()
+        assert not np.isnan(res[source_id + 'open']).any()
+    clock.uinit_clk(endidx)
+
+
+@pytest.mark.parametrize('rightedge', [True, False])
+@pytest.mark.parametrize('back', [None, 30])
+def test_align_values(rightedge, back):
+    # align all values of a finer data, so multiple values
+    # belong to one candle of the clock
+    strategy = _get_strategy('finer')
+    data = strategy.datas[1]
+
+    clock = DataClockHandler(strategy, 'clock')
+    clock.init_clk()
+    startidx, endidx = clock.get_start_end_idx(back=back)
+    dtlist = clock._clk_cache[startidx:endidx + 1]
+    floats = np.asarray(data.datetime.array, dtype=np.float64)
+    values = np.asarray(data.close.array, dtype=np.float64)
+    # add some gaps to the values
+    values[::7] = np.nan
+
+    res = clock._align_values(values, *clock._get_align_idx(
+        floats, startidx, endidx, rightedge=rightedge))
+    expected = _align_slice(
+        dtlist, {'float': list(floats), 'value': list(values)}, rightedge)
+    np.testing.assert_array_equal(res, np.asarray(expected))
+    clock.uinit_clk(endidx)
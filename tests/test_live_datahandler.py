@@ -0,0 +1,121 @@
+import datetime
+
+import backtrader as bt
+import numpy as np
+
+from btplotting import BacktraderPlotting
+from btplotting.figure import FigureType
+from btplotting.live.datahandler import LiveDataHandler
+from btplotting.utils import get_source_id
+
+from testcommon import getdatadir
+
+LOOKBACK = 15
+
+
+class FakeDoc:
+
+    '''
+    Document running callbacks immediately
+    '''
+
+    def add_next_tick_callback(self, cb):
+        cb()
+        return cb
+
+    def remove_next_tick_callback(self, cb):
+        raise ValueError
+
+
+class FakeClient:
+
+    '''
+    Client providing what is needed by LiveDataHandler
+    '''
+
+    def __init__(self, strategy, lookback):
+        self._app = BacktraderPlotting(output_mode='memory')
+        self._doc = FakeDoc()
+        self._figid, self._figurepage = self._app.create_figurepage(
+            strategy, filldata=False)
+        self.lookback = lookback
+
+    def get_app(self):
+        return self._app
+
+    def get_doc(self):
+        return self._doc
+
+    def get_figurepage(self):
+        return self._figurepage
+
+    def get_figid(self):
+        return self._figid
+
+
+class UpdateAnalyzer(bt.Analyzer):
+
+    '''
+    Updates a LiveDataHandler on every new bar and after revising
+    the last bar
+    '''
+
+    def start(self):
+        self.client = None
+        self.handler = None
+        self.results = []
+
+    def _get_state(self):
+        data = self.strategy.data
+        col = get_source_id(data) + 'close'
+        for f in self.client.get_figurepage().figures:
+            if f.get_type() == FigureType.DATA and col in f.cds.data:
+                cds = f.cds.data
+                return (len(self.strategy),
+                        list(cds['index']),
+                        np.asarray(cds[col]).copy())
+        raise Exception('No data figure found')
+
+    def next(self):
+        if len(self.strategy) < 2 * LOOKBACK:
+            return
+        if self.handler is None:
+            self.client = FakeClient(self.strategy, LOOKBACK)
+            self.handler = LiveDataHandler(self.client)
+            return
+        # new bar
+        self.handler.update()
+        new = self._get_state()
+        # revise the last bar
+        self.strategy.data.close[0] += 1.0
+        self.handler.update()
+        revised = self._get_state()
+        self.results.append((new, revised, self.strategy.data.close[0]))
+
+
+def test_live_update():
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(bt.Strategy)
+    cerebro.adddata(bt.feeds.YahooFinanceCSVData(
+        dataname=getdatadir('orcl-1995-2014.txt'),
+        fromdate=datetime.datetime(2000, 1, 1),
+        todate=datetime.datetime(2000, 4, 28),
+        reverse=False))
+    cerebro.addanalyzer(UpdateAnalyzer, _name='update')
+    strategy = cerebro.run()[0]
+    results = strategy.analyzers.update.results
+    assert len(results) > 0
+
+    for new, revised, close in results:
+        strategylen, index, values = new
+        # new bar was streamed, older rows were rolled over
+        assert len(index) == LOOKBACK
+        assert index == list(range(strategylen - LOOKBACK, strategylen))
+        assert values[-1] == close - 1.0
+
+        strategylen, index, values = revised
+        # revised bar was patched without adding a row
+        assert len(index) == LOOKBACK
+        assert index == list(range(strategylen - LOOKBACK, strategylen))
+        assert values[-1] == close
+        np.testing.assert_array_equal(values[:-1], new[2][:-1])
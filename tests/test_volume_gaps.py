@@ -0,0 +1,55 @@
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from btplotting import BacktraderPlotting
+from btplotting.schemes import Blackly
+from btplotting.figure import FigureType
+from btplotting.utils import get_source_id
+
+from testcommon import getdatadir
+
+
+def _get_strategy():
+    df = pd.read_csv(getdatadir('nvda-1999-2014.txt'),
+                     parse_dates=['Date'], index_col='Date')
+    df = df.loc['2014-01-01':'2014-06-30']
+    # second data is missing every third bar
+    gappy = df.iloc[[i for i in range(len(df)) if i % 3 != 1]]
+
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(bt.Strategy)
+    cerebro.adddata(bt.feeds.PandasData(dataname=df), name='full')
+    cerebro.adddata(bt.feeds.PandasData(dataname=gappy), name='gappy')
+    return cerebro.run()[0]
+
+
+def test_separate_volume_with_gaps():
+    strategy = _get_strategy()
+    plot = BacktraderPlotting(
+        style='bar',
+        scheme=Blackly(volume=True, voloverlay=False),
+        output_mode='memory')
+    plot.create_figurepage(strategy)
+    fp = plot.get_figurepage()
+    df = plot.get_data()
+
+    assert any(f.get_type() == FigureType.VOL for f in fp.figures)
+    # the returned data needs to match the data displayed in the
+    # figures the objects are plotted in
+    checked = 0
+    for f in fp.figures:
+        if f.get_type() == FigureType.VOL:
+            continue
+        for c, values in f.cds.data.items():
+            if c not in df.columns or c in ('index', 'datetime'):
+                continue
+            expected = np.asarray(values)
+            if expected.dtype.kind != 'f':
+                continue
+            np.testing.assert_array_equal(df[c].to_numpy(), expected)
+            checked += 1
+    assert checked > 0
+    # gaps of the second data are kept
+    close = get_source_id(strategy.datas[1]) + 'close'
+    assert df[close].isna().sum() > 0